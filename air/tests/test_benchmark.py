@@ -0,0 +1,35 @@
+from whitevest.bin.benchmark import (
+    benchmark_operation,
+    compare_benchmarks,
+    operation_benchmarks,
+)
+
+
+def test_benchmark_operation():
+    calls = []
+    rate = benchmark_operation(lambda: calls.append(1), 0.05)
+    assert rate > 0
+    assert len(calls) >= 100
+
+
+def test_operation_benchmarks_run():
+    for operation in operation_benchmarks().values():
+        operation()
+
+
+def test_compare_benchmarks():
+    baseline = {
+        "fast": dict(value=100.0, unit="ops/sec", higher_is_better=True),
+        "cpu": dict(value=0.1, unit="fraction", higher_is_better=False),
+    }
+    results = {
+        "fast": dict(value=80.0, unit="ops/sec", higher_is_better=True),
+        "cpu": dict(value=0.12, unit="fraction", higher_is_better=False),
+        "new": dict(value=1.0, unit="ops/sec", higher_is_better=True),
+    }
+    assert not compare_benchmarks(results, baseline, 0.25)
+    results["fast"]["value"] = 70.0
+    results["cpu"]["value"] = 0.2
+    regressions = compare_benchmarks(results, baseline, 0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("fast")
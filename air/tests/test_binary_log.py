@@ -0,0 +1,90 @@
+import io
+import random
+from queue import Queue
+
+import pytest
+
+from whitevest.lib.binary_log import (
+    BINARY_LOG_HEADER,
+    BINARY_LOG_RECORD,
+    convert_binary_log_to_csv,
+    read_binary_log,
+    write_binary_log_header,
+    write_binary_queue_log,
+)
+from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
+from whitevest.lib.utils import write_queue_log
+
+
+class CountingFile(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def random_row():
+    return tuple(random.random() for _ in range(TELEMETRY_TUPLE_LENGTH))
+
+
+def test_write_binary_queue_log():
+    outfile = CountingFile()
+    data_queue = Queue()
+    rows = [random_row() for _ in range(10)]
+    for row in rows:
+        data_queue.put(row)
+    write_binary_log_header(outfile)
+    assert write_binary_queue_log(outfile, data_queue) == 10
+    assert outfile.writes == 2
+    assert len(outfile.getvalue()) == BINARY_LOG_HEADER.size + (
+        10 * BINARY_LOG_RECORD.size
+    )
+    outfile.seek(0)
+    assert list(read_binary_log(outfile)) == rows
+
+
+def test_write_binary_queue_log_max_lines():
+    outfile = io.BytesIO()
+    data_queue = Queue()
+    for _ in range(10):
+        data_queue.put(random_row())
+    assert write_binary_queue_log(outfile, data_queue, 4) == 4
+    assert data_queue.qsize() == 6
+
+
+def test_read_binary_log_truncated():
+    outfile = io.BytesIO()
+    data_queue = Queue()
+    rows = [random_row() for _ in range(3)]
+    for row in rows:
+        data_queue.put(row)
+    write_binary_log_header(outfile)
+    write_binary_queue_log(outfile, data_queue)
+    infile = io.BytesIO(outfile.getvalue()[:-5])
+    assert list(read_binary_log(infile)) == rows[:2]
+
+
+def test_read_binary_log_bad_header():
+    with pytest.raises(ValueError):
+        list(read_binary_log(io.BytesIO(b"sensor,log,csv\n")))
+
+
+def test_convert_binary_log_to_csv():
+    rows = [random_row() for _ in range(5)]
+    binary_queue = Queue()
+    csv_queue = Queue()
+    for row in rows:
+        binary_queue.put(row)
+        csv_queue.put(row)
+    binary_file = io.BytesIO()
+    write_binary_log_header(binary_file)
+    write_binary_queue_log(binary_file, binary_queue)
+    binary_file.seek(0)
+    converted = io.StringIO()
+    assert convert_binary_log_to_csv(binary_file, converted) == 5
+    expected = io.StringIO()
+    write_queue_log(expected, csv_queue)
+    assert converted.getvalue() == expected.getvalue()
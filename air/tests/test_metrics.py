@@ -0,0 +1,41 @@
+import io
+import json
+import time
+
+from whitevest.lib.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_record():
+    histogram = Histogram((10, 100))
+    for value in (5, 10, 50, 500):
+        histogram.record(value)
+    assert histogram.counts == [2, 1, 1]
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["max"] == 500
+    assert snapshot["mean"] == 141.25
+    assert snapshot["buckets"] == dict(le_10=2, le_100=1, inf=1)
+
+
+def test_histogram_record_since():
+    histogram = Histogram()
+    histogram.record_since(time.perf_counter_ns() - 1_000_000)
+    assert histogram.count == 1
+    assert histogram.max >= 1_000_000
+
+
+def test_metrics_registry():
+    registry = MetricsRegistry()
+    assert registry.counter("dropped") is registry.counter("dropped")
+    registry.counter("dropped").increment()
+    registry.counter("dropped").increment(2)
+    registry.gauge("depth").set(5)
+    registry.gauge("depth").set(2)
+    registry.histogram("send").record(20_000)
+    outfile = io.StringIO()
+    registry.dump(outfile, 1.5)
+    dumped = json.loads(outfile.getvalue())
+    assert dumped["timestamp"] == 1.5
+    assert dumped["counters"] == dict(dropped=3)
+    assert dumped["gauges"] == dict(depth=dict(value=2, max=5))
+    assert dumped["histograms"]["send"]["count"] == 1
@@ -0,0 +1,85 @@
+import random
+import time
+from queue import Queue
+
+from whitevest.lib.atomic_value import AtomicValue
+from whitevest.lib.binary_log import write_binary_log_header, write_binary_queue_log
+from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
+from whitevest.lib.replay import ReplayRadio, read_sensor_log
+from whitevest.lib.ring_buffer import RingBuffer
+from whitevest.lib.telemetry_frame import FrameEncoder
+from whitevest.lib.utils import write_queue_log
+from whitevest.threads.air import replay_sensor_reading_loop
+
+
+def recorded_rows(count):
+    return [
+        (i * 0.01, *[random.random() for _ in range(TELEMETRY_TUPLE_LENGTH - 1)])
+        for i in range(count)
+    ]
+
+
+def write_csv_log(path, rows):
+    data_queue = Queue()
+    for row in rows:
+        data_queue.put(row)
+    with open(path, "w", encoding="utf8") as outfile:
+        write_queue_log(outfile, data_queue)
+
+
+def test_read_sensor_log_csv(tmp_path):
+    rows = recorded_rows(10)
+    path = str(tmp_path / "sensor_log_1.csv")
+    write_csv_log(path, rows)
+    assert list(read_sensor_log(path)) == rows
+
+
+def test_read_sensor_log_binary(tmp_path):
+    rows = recorded_rows(10)
+    data_queue = Queue()
+    for row in rows:
+        data_queue.put(row)
+    path = str(tmp_path / "sensor_log_1.bin")
+    with open(path, "wb") as outfile:
+        write_binary_log_header(outfile)
+        write_binary_queue_log(outfile, data_queue)
+    assert list(read_sensor_log(path)) == rows
+
+
+def test_replay_radio():
+    start_time = time.time() - 2.0
+    radio = ReplayRadio(start_time)
+    rows = recorded_rows(2)
+    radio.send(FrameEncoder().encode(0.0, rows))
+    assert radio.frames_sent == 1
+    assert radio.bytes_sent == len(radio.sent)
+    assert radio.max_latency >= 2.0 - rows[1][0]
+
+
+def test_replay_sensor_reading_loop(tmp_path):
+    rows = recorded_rows(50)
+    path = str(tmp_path / "sensor_log_1.csv")
+    write_csv_log(path, rows)
+    data_queue = Queue()
+    current_readings = RingBuffer(100)
+    continue_running = AtomicValue(True)
+    replay_sensor_reading_loop(
+        path, 0.0, time.time(), data_queue, current_readings, continue_running
+    )
+    assert not continue_running.get_value()
+    assert data_queue.qsize() == 50
+    assert current_readings.get_sequence() == 50
+    replayed = data_queue.get()
+    assert replayed[1:3] == rows[0][1:3]
+    assert replayed[3:9] == rows[0][3:9]
+    assert replayed[9:13] == rows[0][9:13]
+
+
+def test_replay_sensor_reading_loop_realtime(tmp_path):
+    path = str(tmp_path / "sensor_log_1.csv")
+    write_csv_log(path, recorded_rows(21))
+    start_time = time.time()
+    replay_sensor_reading_loop(
+        path, 1.0, start_time, Queue(), RingBuffer(100), AtomicValue(True)
+    )
+    assert time.time() - start_time >= 0.2
@@ -0,0 +1,61 @@
+import random
+import time
+from threading import Thread
+
+from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
+from whitevest.lib.ring_buffer import RingBuffer
+
+
+def random_row():
+    return tuple(random.random() for _ in range(TELEMETRY_TUPLE_LENGTH))
+
+
+def test_ring_buffer_put_read_row():
+    buffer = RingBuffer(4)
+    rows = [random_row() for _ in range(6)]
+    for row in rows:
+        buffer.put(row)
+    assert buffer.get_sequence() == 6
+    assert buffer.read_row(1) is None
+    assert buffer.read_row(2) is None
+    assert buffer.read_row(3) == rows[3]
+    assert buffer.read_row(5) == rows[5]
+    assert buffer.read_row(6) is None
+
+
+def test_ring_buffer_read_new():
+    buffer = RingBuffer(10)
+    rows = [random_row() for _ in range(5)]
+    for row in rows:
+        buffer.put(row)
+    assert buffer.read_new(2) == [rows[0], rows[3]]
+    assert buffer.read_new(2) is None
+    buffer.put(rows[0])
+    assert buffer.read_new(2) is None
+    buffer.put(rows[1])
+    assert buffer.read_new(2) == [rows[0], rows[1]]
+
+
+def test_ring_buffer_read_new_skips_overwritten():
+    buffer = RingBuffer(3)
+    rows = [random_row() for _ in range(7)]
+    for row in rows:
+        buffer.put(row)
+    assert buffer.read_new(2) == [rows[5], rows[6]]
+
+
+def test_ring_buffer_wait_for_new():
+    buffer = RingBuffer(10)
+    buffer.put(random_row())
+    assert not buffer.wait_for_new(2, 0.01)
+
+    def writer():
+        time.sleep(0.05)
+        buffer.put(random_row())
+
+    thread = Thread(target=writer)
+    thread.start()
+    assert buffer.wait_for_new(2, 5.0)
+    thread.join()
+    assert len(buffer.read_new(2)) == 2
+    assert not buffer.wait_for_new(1, 0.01)
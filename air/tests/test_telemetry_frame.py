@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
+from whitevest.lib.telemetry_frame import (
+    ENCODING_DELTA,
+    ENCODING_FIXED,
+    ENCODING_FLOAT32,
+    ENCODING_FLOAT64,
+    ENCODING_LEGACY,
+    FRAME_ENCODING_IDS,
+    RADIO_PAYLOAD_LIMIT,
+    FrameEncoder,
+    decode_frame,
+    decode_frame_header,
+)
+
+
+def flight_row(timestamp):
+    return (
+        timestamp,
+        101325.0 - (timestamp * 10.0) + random.random(),
+        20.0 + random.random(),
+        *[random.uniform(-20.0, 20.0) for _ in range(3)],
+        *[random.uniform(-50.0, 50.0) for _ in range(3)],
+        38.8977 + (random.random() / 10000.0),
+        -77.0365 + (random.random() / 10000.0),
+        1.0,
+        9.0,
+    )
+
+
+def assert_rows_close(expected, decoded, tolerances):
+    assert len(expected) == len(decoded)
+    for expected_row, decoded_row in zip(expected, decoded):
+        assert len(decoded_row) == TELEMETRY_TUPLE_LENGTH
+        for expected_value, decoded_value, tolerance in zip(
+            expected_row, decoded_row, tolerances
+        ):
+            assert decoded_value == pytest.approx(expected_value, abs=tolerance)
+
+
+def test_legacy_frame():
+    encoder = FrameEncoder(ENCODING_LEGACY, 10)
+    assert encoder.samples == 2
+    rows = [flight_row(1.0), flight_row(1.1)]
+    encoded = encoder.encode(0.5, rows)
+    assert len(encoded) == (TELEMETRY_TUPLE_LENGTH * 8 * 2) + 8
+    status, decoded = decode_frame(encoded)
+    assert status == 0.5
+    assert decoded == rows
+
+
+@pytest.mark.parametrize(
+    "encoding",
+    [ENCODING_FLOAT64, ENCODING_FLOAT32, ENCODING_FIXED, ENCODING_DELTA],
+)
+def test_frame_round_trip(encoding):
+    encoder = FrameEncoder(encoding)
+    rows = [flight_row(1.0 + (i * 0.01)) for i in range(encoder.samples)]
+    encoded = encoder.encode(0.25, rows)
+    assert len(encoded) <= RADIO_PAYLOAD_LIMIT
+    assert encoded[3] == FRAME_ENCODING_IDS[encoding]
+    status, decoded = decode_frame(encoded)
+    assert status == 0.25
+    tolerances = [0.001, 0.1, 0.01] + [0.01] * 3 + [0.1] * 3 + [1e-6] * 2 + [0] * 2
+    if encoding == ENCODING_FLOAT32:
+        tolerances = [0.001, 0.01, 0.001] + [0.001] * 6 + [1e-5] * 2 + [0] * 2
+    assert_rows_close(rows, decoded, tolerances)
+
+
+def test_more_samples_per_frame():
+    legacy = FrameEncoder(ENCODING_LEGACY)
+    assert FrameEncoder(ENCODING_FLOAT32).samples > legacy.samples
+    assert FrameEncoder(ENCODING_FIXED).samples > FrameEncoder(ENCODING_FLOAT32).samples
+    assert FrameEncoder(ENCODING_DELTA).samples > FrameEncoder(ENCODING_FIXED).samples
+    assert FrameEncoder(ENCODING_DELTA, 3).samples == 3
+
+
+def test_delta_frame_falls_back_to_fixed():
+    encoder = FrameEncoder(ENCODING_DELTA, 2)
+    rows = [flight_row(1.0), flight_row(100.0)]
+    encoded = encoder.encode(0.0, rows)
+    assert encoded[3] == FRAME_ENCODING_IDS[ENCODING_FIXED]
+    _, decoded = decode_frame(encoded)
+    assert decoded[1][0] == pytest.approx(100.0)
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError):
+        FrameEncoder("morse")
+    with pytest.raises(ValueError):
+        decode_frame(b"garbage")
+
+
+def test_frame_health():
+    encoder = FrameEncoder(ENCODING_FIXED, 1)
+    encoded = encoder.encode(0.0, [flight_row(1.0)], (70000, 12))
+    header = decode_frame_header(encoded)
+    assert header["dropped_samples"] == 0xFFFF
+    assert header["queue_depth"] == 12
+    legacy = FrameEncoder().encode(0.0, [flight_row(1.0)] * 2)
+    assert decode_frame_header(legacy) is None
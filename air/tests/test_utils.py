@@ -4,10 +4,12 @@ import time
 from queue import Queue
 from threading import Thread
 
-from whitevest.lib.atomic_buffer import AtomicBuffer
 from whitevest.lib.atomic_value import AtomicValue
 from whitevest.lib.configuration import Configuration
 from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
+from whitevest.lib.metrics import DROPPED_SAMPLES
+from whitevest.lib.ring_buffer import RingBuffer
+from whitevest.lib.telemetry_frame import ENCODING_FIXED, FrameEncoder, decode_frame
 from whitevest.lib.utils import (
     digest_next_sensor_reading,
     take_gps_reading,
@@ -56,7 +58,7 @@ def test_digest_next_sensor_reading():
     gps_value = [random.random() for _ in range(4)]
     magnetometer_accelerometer_value = [random.random() for _ in range(6)]
     data_queue = Queue()
-    current_reading = AtomicBuffer(1)
+    current_reading = RingBuffer(2)
     now = digest_next_sensor_reading(
         start_time,
         data_queue,
@@ -74,7 +76,7 @@ def test_digest_next_sensor_reading():
     )
     assert logged
     assert logged == expected_tuple
-    assert current_reading.read()[0] == expected_tuple
+    assert current_reading.read_row(0) == expected_tuple
     assert len(logged) == TELEMETRY_TUPLE_LENGTH
 
 
@@ -104,7 +106,7 @@ def test_transmit_latest_readings():
     start_time = time.time()
     rfm9x = MockRFM9X()
     camera_is_running = AtomicValue(0.0)
-    current_reading = AtomicBuffer(2)
+    current_reading = RingBuffer(3)
     current_reading.put([random.random() for _ in range(TELEMETRY_TUPLE_LENGTH)])
     current_reading.put([random.random() for _ in range(TELEMETRY_TUPLE_LENGTH)])
     readings_sent_1, last_check_1 = transmit_latest_readings(
@@ -114,3 +116,32 @@ def test_transmit_latest_readings():
     assert last_check < last_check_1
     assert last_check_1 <= time.time()
     assert len(rfm9x.sent) == (TELEMETRY_TUPLE_LENGTH * 8 * 2) + 8
+
+
+def test_transmit_latest_readings_frame_encoder():
+    rfm9x = MockRFM9X()
+    current_reading = RingBuffer(20)
+    frame_encoder = FrameEncoder(ENCODING_FIXED, 5)
+    for _ in range(4):
+        current_reading.put([random.random() for _ in range(TELEMETRY_TUPLE_LENGTH)])
+    readings_sent, _ = transmit_latest_readings(
+        AtomicValue(0.0), rfm9x, 1, 0, time.time(), current_reading, frame_encoder
+    )
+    assert readings_sent == 0
+    current_reading.put([random.random() for _ in range(TELEMETRY_TUPLE_LENGTH)])
+    readings_sent, _ = transmit_latest_readings(
+        AtomicValue(0.0), rfm9x, 1, 0, time.time(), current_reading, frame_encoder
+    )
+    assert readings_sent == 1
+    assert len(decode_frame(rfm9x.sent)[1]) == 5
+
+
+def test_digest_next_sensor_reading_counts_drops():
+    data_queue = Queue(1)
+    current_reading = RingBuffer(2)
+    dropped = DROPPED_SAMPLES.value
+    for _ in range(3):
+        digest_next_sensor_reading(
+            time.time(), data_queue, current_reading, [0.0] * 4, [0.0] * 2, [0.0] * 6
+        )
+    assert DROPPED_SAMPLES.value == dropped + 2
@@ -2,23 +2,27 @@
 import logging
 import os
 import time
-from queue import Queue
 from threading import Thread
 
-from whitevest.lib.atomic_buffer import AtomicBuffer
 from whitevest.lib.atomic_value import AtomicValue
 from whitevest.lib.configuration import Configuration
+from whitevest.lib.const import REPLAY_DATA, REPLAY_SPEED
 from whitevest.lib.hardware import init_reset_button
+from whitevest.lib.replay import ReplayRadio
+from whitevest.lib.ring_buffer import RingBuffer
+from whitevest.lib.sample_queue import SampleQueue
 from whitevest.lib.utils import create_gps_thread
 from whitevest.threads.air import (
     camera_thread,
+    metrics_logging_loop,
+    replay_sensor_reading_loop,
     sensor_log_writing_loop,
     sensor_reading_loop,
     transmitter_thread,
 )
 
 
-def main():
+def main():  # pylint: disable=too-many-locals
     """Inboard data capture and transmission script"""
 
     # Load up the system configuration
@@ -27,13 +31,16 @@ def main():
     )
 
     # Queue to manage data synchronization between sensor reading, transmission, and data logging
-    data_queue = Queue(1000)
+    data_queue = SampleQueue(
+        configuration.get("data_queue_size", 1000),
+        configuration.get("data_queue_overflow", 0),
+    )
 
     # Timestamp to use for log files and log saving cutoff
     start_time = time.time()
 
     # Thread safe place to store altitude reading
-    current_readings = AtomicBuffer(50)
+    current_readings = RingBuffer(50)
 
     # Holds the most recent GPS data
     gps_value = AtomicValue((0.0, 0.0, 0.0, 0.0))
@@ -47,11 +54,20 @@ def main():
     # Thread safe place to store continue value
     continue_logging = AtomicValue(True)
 
+    # Stand in for the radio when replaying a recorded log without hardware
+    replay_radio = ReplayRadio(start_time) if REPLAY_DATA else None
+
     # Setup listener for reset button
-    init_reset_button(configuration, continue_running)
+    if not REPLAY_DATA:
+        init_reset_button(configuration, continue_running)
 
-    gps_thread = create_gps_thread(configuration, gps_value, continue_running)
-    gps_thread.start()
+    # Threads that only make sense with the real hardware attached
+    hardware_threads = []
+
+    if not REPLAY_DATA:
+        hardware_threads.append(
+            create_gps_thread(configuration, gps_value, continue_running)
+        )
 
     write_thread = Thread(
         target=sensor_log_writing_loop,
@@ -66,12 +82,24 @@ def main():
     )
     write_thread.start()
 
-    camera_thread_handle = Thread(
-        target=camera_thread,
-        args=(configuration, start_time, continue_running, continue_logging),
+    metrics_thread = Thread(
+        target=metrics_logging_loop,
+        args=(configuration, start_time, continue_running),
         daemon=True,
     )
-    camera_thread_handle.start()
+    metrics_thread.start()
+
+    if not REPLAY_DATA:
+        hardware_threads.append(
+            Thread(
+                target=camera_thread,
+                args=(configuration, start_time, continue_running, continue_logging),
+                daemon=True,
+            )
+        )
+
+    for thread in hardware_threads:
+        thread.start()
 
     transmitter_thread_handle = Thread(
         target=transmitter_thread,
@@ -81,23 +109,38 @@ def main():
             current_readings,
             pcnt_to_limit,
             continue_running,
+            replay_radio,
         ),
         daemon=True,
     )
     transmitter_thread_handle.start()
 
-    sensor_reading_thread = Thread(
-        target=sensor_reading_loop,
-        args=(
-            configuration,
-            start_time,
-            data_queue,
-            current_readings,
-            gps_value,
-            continue_running,
-        ),
-        daemon=True,
-    )
+    if REPLAY_DATA:
+        sensor_reading_thread = Thread(
+            target=replay_sensor_reading_loop,
+            args=(
+                REPLAY_DATA,
+                REPLAY_SPEED,
+                start_time,
+                data_queue,
+                current_readings,
+                continue_running,
+            ),
+            daemon=True,
+        )
+    else:
+        sensor_reading_thread = Thread(
+            target=sensor_reading_loop,
+            args=(
+                configuration,
+                start_time,
+                data_queue,
+                current_readings,
+                gps_value,
+                continue_running,
+            ),
+            daemon=True,
+        )
     sensor_reading_thread.start()
 
     runtime_limit = configuration.get("runtime_limit")
@@ -108,14 +151,18 @@ def main():
     continue_logging.update(False)
 
     write_thread.join()
-    camera_thread_handle.join()
+    for thread in hardware_threads:
+        thread.join()
     pcnt_to_limit.update(1)
 
     logging.info("Write activities ended")
 
-    gps_thread.join()
     transmitter_thread_handle.join()
     sensor_reading_thread.join()
+    metrics_thread.join()
+
+    if replay_radio:
+        replay_radio.log_summary()
 
 
 if __name__ == "__main__":
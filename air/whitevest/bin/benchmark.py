@@ -0,0 +1,318 @@
+"""Benchmark suite for the air runtime hot paths"""
+import argparse
+import io
+import json
+import logging
+import sys
+import time
+from queue import Queue
+from threading import Thread
+from typing import Callable, Dict, List, Tuple
+
+from whitevest.lib.atomic_buffer import AtomicBuffer
+from whitevest.lib.atomic_value import AtomicValue
+from whitevest.lib.binary_log import write_binary_queue_log
+from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
+from whitevest.lib.hardware import DummyAccel, DummyBMP, DummyMag
+from whitevest.lib.metrics import Counter, Histogram
+from whitevest.lib.ring_buffer import RingBuffer
+from whitevest.lib.telemetry_frame import ENCODING_DELTA, FrameEncoder
+from whitevest.lib.utils import (
+    digest_next_sensor_reading,
+    take_gps_reading,
+    transmit_latest_readings,
+    write_queue_log,
+)
+
+BENCHMARK_TIME_LENGTH = 5
+OPERATION_TIME_LENGTH = 1
+RADIO_SEND_TIME = 0.05
+DEFAULT_TOLERANCE = 0.25
+GGA_LINE = (
+    "$GPGGA,134658.00,5106.9792,N,11402.3003,W,2,09,1.0,1048.47,M,-16.27,M,08,AAAA*60"
+)
+
+
+class BenchmarkRadio:  # pylint: disable=too-few-public-methods
+    """Radio that discards everything it is asked to send"""
+
+    def send(self, data: bytes):
+        """Discard the frame"""
+
+
+class BenchmarkSerial:  # pylint: disable=too-few-public-methods
+    """Serial port that always has a GGA sentence ready"""
+
+    # pylint: disable=no-self-use
+    def readline(self) -> str:
+        """Return the canned sentence"""
+        return GGA_LINE
+
+
+def benchmark_operation(
+    operation: Callable, duration: float = OPERATION_TIME_LENGTH, repeat: int = 5
+) -> float:
+    """Run an operation back to back and return the best rate per second seen"""
+    best_rate = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start_time = time.perf_counter()
+        end_time = start_time + (duration / repeat)
+        while True:
+            for _ in range(100):
+                operation()
+            calls += 100
+            now = time.perf_counter()
+            if now >= end_time:
+                break
+        best_rate = max(best_rate, float(calls) / (now - start_time))
+    return best_rate
+
+
+def benchmark_buffer_contention(
+    put: Callable, drain: Callable, duration: float = BENCHMARK_TIME_LENGTH
+) -> Tuple[float, float]:
+    """Measure the sensor thread's put rate and the CPU spent by a thread draining the buffer"""
+    continue_running = AtomicValue(True)
+    drain_cpu_time = AtomicValue(0.0)
+
+    def drain_loop():
+        start_cpu_time = time.thread_time()
+        while continue_running.get_value():
+            drain()
+            time.sleep(0)
+        drain_cpu_time.update(time.thread_time() - start_cpu_time)
+
+    reader = Thread(target=drain_loop, daemon=True)
+    reader.start()
+    row = tuple(float(i) for i in range(TELEMETRY_TUPLE_LENGTH))
+    puts = 0
+    start_time = time.time()
+    while time.time() - start_time < duration:
+        put(row)
+        puts += 1
+    total_time = time.time() - start_time
+    continue_running.update(False)
+    reader.join()
+    return float(puts) / total_time, drain_cpu_time.get_value() / total_time
+
+
+def drain_atomic_buffer(buffer: AtomicBuffer):
+    """Mimic the transmitter's historical read-then-clear access pattern"""
+    infos = buffer.read()
+    if infos[0] and infos[int(len(infos) / 2)]:
+        buffer.clear()
+
+
+def benchmark_transmitter(
+    wait: bool, sample_interval: float, duration: float = BENCHMARK_TIME_LENGTH
+) -> Tuple[float, float]:
+    """Measure the sensor thread's sample rate and the transmitter's CPU use"""
+    buffer = RingBuffer(50)
+    continue_running = AtomicValue(True)
+    transmitter_cpu_time = AtomicValue(0.0)
+
+    def transmitter_loop():
+        start_cpu_time = time.thread_time()
+        while continue_running.get_value():
+            if wait:
+                if buffer.wait_for_new(2, 1.0) and buffer.read_new(2):
+                    time.sleep(RADIO_SEND_TIME)
+            else:
+                if buffer.read_new(2):
+                    time.sleep(RADIO_SEND_TIME)
+                time.sleep(0)
+        transmitter_cpu_time.update(time.thread_time() - start_cpu_time)
+
+    transmitter = Thread(target=transmitter_loop, daemon=True)
+    transmitter.start()
+    row = tuple(float(i) for i in range(TELEMETRY_TUPLE_LENGTH))
+    samples = 0
+    start_time = time.time()
+    while time.time() - start_time < duration:
+        # Stand in for a bus transaction, which releases the GIL while it waits
+        time.sleep(sample_interval)
+        buffer.put(row)
+        samples += 1
+    total_time = time.time() - start_time
+    continue_running.update(False)
+    transmitter.join()
+    return float(samples) / total_time, transmitter_cpu_time.get_value() / total_time
+
+
+def filled_queue(size: int) -> Queue:
+    """Make a queue holding size telemetry rows"""
+    data_queue = Queue()
+    row = tuple(float(i) for i in range(TELEMETRY_TUPLE_LENGTH))
+    for _ in range(size):
+        data_queue.put(row)
+    return data_queue
+
+
+def operation_benchmarks() -> Dict[str, Callable]:  # pylint: disable=too-many-locals
+    """Build the single-threaded operations to time"""
+    row = tuple(float(i) for i in range(TELEMETRY_TUPLE_LENGTH))
+    bmp = DummyBMP()
+    mag = DummyMag()
+    accel = DummyAccel()
+    gps_value = AtomicValue((0.0, 0.0, 0.0, 0.0))
+    digest_queue = Queue()
+    digest_readings = RingBuffer(50)
+
+    def digest():
+        digest_next_sensor_reading(
+            0.0,
+            digest_queue,
+            digest_readings,
+            gps_value.get_value(),
+            bmp._read(),  # pylint: disable=protected-access
+            (*accel.acceleration, *mag.magnetic),
+        )
+        if digest_queue.qsize() > 1000:
+            digest_queue.queue.clear()
+
+    atomic_buffer = AtomicBuffer(50)
+    ring_buffer = RingBuffer(50)
+
+    def ring_buffer_read():
+        ring_buffer.put(row)
+        ring_buffer.put(row)
+        ring_buffer.read_new(2)
+
+    def write_log(write_function: Callable, outfile) -> Callable:
+        def write():
+            outfile.seek(0)
+            write_function(outfile, filled_queue(100), 100)
+
+        return write
+
+    def transmit(frame_encoder: FrameEncoder) -> Callable:
+        radio = BenchmarkRadio()
+        readings = RingBuffer(50)
+        pcnt_to_limit = AtomicValue(0.0)
+
+        def send():
+            for _ in range(frame_encoder.samples):
+                readings.put(row)
+            transmit_latest_readings(
+                pcnt_to_limit, radio, 0, 0, 0, readings, frame_encoder
+            )
+
+        return send
+
+    gps_serial = BenchmarkSerial()
+    counter = Counter()
+    histogram = Histogram()
+
+    return {
+        "digest_next_sensor_reading": digest,
+        "atomic_buffer_put": lambda: atomic_buffer.put(row),
+        "atomic_buffer_read": atomic_buffer.read,
+        "ring_buffer_put": lambda: ring_buffer.put(row),
+        "ring_buffer_put_put_read_new": ring_buffer_read,
+        "write_queue_log_100": write_log(write_queue_log, io.StringIO()),
+        "write_binary_queue_log_100": write_log(write_binary_queue_log, io.BytesIO()),
+        "transmit_latest_readings_legacy": transmit(FrameEncoder()),
+        "transmit_latest_readings_delta": transmit(FrameEncoder(ENCODING_DELTA)),
+        "take_gps_reading": lambda: take_gps_reading(gps_serial, gps_value),
+        "metrics_counter_increment": counter.increment,
+        "metrics_histogram_record": lambda: histogram.record(250_000),
+    }
+
+
+def run_benchmarks(
+    operation_duration: float = OPERATION_TIME_LENGTH,
+    threaded_duration: float = BENCHMARK_TIME_LENGTH,
+) -> Dict[str, dict]:
+    """Run the whole suite and return each result with its direction"""
+    results = {}
+    for name, operation in operation_benchmarks().items():
+        add_result(
+            results, name, benchmark_operation(operation, operation_duration), "ops/sec"
+        )
+    if threaded_duration <= 0:
+        return results
+
+    atomic_buffer = AtomicBuffer(50)
+    rate, _ = benchmark_buffer_contention(
+        atomic_buffer.put,
+        lambda: drain_atomic_buffer(atomic_buffer),
+        threaded_duration,
+    )
+    add_result(results, "atomic_buffer_contended_put", rate, "ops/sec")
+    ring_buffer = RingBuffer(50)
+    rate, _ = benchmark_buffer_contention(
+        ring_buffer.put, lambda: ring_buffer.read_new(2), threaded_duration
+    )
+    add_result(results, "ring_buffer_contended_put", rate, "ops/sec")
+    for wait in (False, True):
+        name = "waiting_transmitter" if wait else "polling_transmitter"
+        sample_rate, _ = benchmark_transmitter(wait, 0.0005, threaded_duration)
+        add_result(results, f"{name}_sample_rate", sample_rate, "samples/sec")
+        _, idle_cpu = benchmark_transmitter(wait, 0.1, threaded_duration)
+        add_result(results, f"{name}_idle_cpu", idle_cpu, "fraction", False)
+    return results
+
+
+def add_result(
+    results: Dict[str, dict],
+    name: str,
+    value: float,
+    unit: str,
+    higher_is_better: bool = True,
+):
+    """Record and log one benchmark result"""
+    results[name] = dict(value=value, unit=unit, higher_is_better=higher_is_better)
+    logging.info("%s: %f %s", name, value, unit)
+
+
+def compare_benchmarks(
+    results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """List every result that is worse than the baseline by more than the tolerance"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["value"]
+        actual = result["value"]
+        if result.get("higher_is_better", True):
+            regressed = actual < expected * (1.0 - tolerance)
+        else:
+            regressed = actual > expected * (1.0 + tolerance)
+        if regressed:
+            regressions.append(
+                f"{name}: {actual:f} {result['unit']} vs baseline {expected:f}"
+            )
+    return regressions
+
+
+def main():
+    """Run the benchmark suite and compare it against a stored baseline"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--output", help="Path to save the results JSON to")
+    parser.add_argument("--baseline", help="Path to a baseline results JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--duration", type=float, default=OPERATION_TIME_LENGTH)
+    parser.add_argument(
+        "--threaded-duration", type=float, default=BENCHMARK_TIME_LENGTH
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.duration, args.threaded_duration)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as outfile:
+            json.dump(results, outfile, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf8") as infile:
+            baseline = json.load(infile)
+        regressions = compare_benchmarks(results, baseline, args.tolerance)
+        for regression in regressions:
+            logging.error("Benchmark regression: %s", regression)
+        if regressions:
+            sys.exit(1)
+        logging.info("No benchmark regressions against %s", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
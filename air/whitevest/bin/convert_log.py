@@ -0,0 +1,32 @@
+"""Convert a binary sensor log into the CSV format used by the ground tool"""
+import logging
+import os
+import sys
+
+from whitevest.lib.binary_log import convert_binary_log_to_csv
+
+
+def main():
+    """Convert a binary sensor log into the CSV format used by the ground tool"""
+    if len(sys.argv) < 2:
+        logging.error("Usage: python3 -m whitevest.bin.convert_log INPUT [OUTPUT]")
+        sys.exit(1)
+    input_path = sys.argv[1]
+    output_path = (
+        sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(input_path)[0] + ".csv"
+    )
+    gap_output_path = os.path.splitext(output_path)[0] + "_gaps.csv"
+    with open(input_path, "rb") as infile, open(
+        output_path, "w", encoding="utf8"
+    ) as outfile, open(gap_output_path, "w", encoding="utf8") as gap_outfile:
+        lines = convert_binary_log_to_csv(infile, outfile, gap_outfile)
+    logging.info(
+        "Converted %d records to %s with gaps in %s",
+        lines,
+        output_path,
+        gap_output_path,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@ import logging
 import os
 import time
 
-from whitevest.lib.atomic_buffer import AtomicBuffer
 from whitevest.lib.atomic_value import AtomicValue
 from whitevest.lib.configuration import Configuration
 from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
@@ -13,6 +12,7 @@ from whitevest.lib.hardware import (
     init_magnetometer_accelerometer,
     init_radio,
 )
+from whitevest.lib.ring_buffer import RingBuffer
 from whitevest.lib.utils import (
     handle_exception,
     take_gps_reading,
@@ -45,12 +45,12 @@ def test_rfm9x(configuration: Configuration):
         rfm9x = init_radio(configuration)
         if rfm9x:
             camera_is_running = AtomicValue(0.0)
-            current_reading = AtomicBuffer(2)
-            current_reading.put([0.0 for _ in range(TELEMETRY_TUPLE_LENGTH)])
-            current_reading.put([0.0 for _ in range(TELEMETRY_TUPLE_LENGTH)])
+            current_reading = RingBuffer(3)
             start_time = time.time()
             transmissions = 0
             while time.time() - start_time < TEST_TIME_LENGTH:
+                current_reading.put([0.0 for _ in range(TELEMETRY_TUPLE_LENGTH)])
+                current_reading.put([0.0 for _ in range(TELEMETRY_TUPLE_LENGTH)])
                 transmit_latest_readings(
                     camera_is_running, rfm9x, 0, 0, 0, current_reading
                 )
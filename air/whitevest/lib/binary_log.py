@@ -0,0 +1,113 @@
+"""Packed, append-only binary format for the sensor log
+
+Every record is a full telemetry row, except gap records, which have a NaN
+timestamp followed by the first and last timestamps of a run of dropped rows
+and the number of rows dropped.
+"""
+import math
+import struct
+from queue import Queue
+from typing import Iterator, Sequence, Tuple
+
+from whitevest.lib.const import TELEMETRY_STRUCT_STRING, TELEMETRY_TUPLE_LENGTH
+from whitevest.lib.sample_queue import format_gap
+
+BINARY_LOG_MAGIC = b"WVLG"
+BINARY_LOG_VERSION = 2
+SUPPORTED_BINARY_LOG_VERSIONS = (1, 2)
+BINARY_LOG_HEADER = struct.Struct("<4sHH")
+BINARY_LOG_RECORD = struct.Struct("<" + TELEMETRY_STRUCT_STRING)
+
+READ_CHUNK_RECORDS = 1024
+
+
+def write_binary_log_header(outfile):
+    """Write the versioned header that starts every binary log"""
+    outfile.write(
+        BINARY_LOG_HEADER.pack(
+            BINARY_LOG_MAGIC, BINARY_LOG_VERSION, TELEMETRY_TUPLE_LENGTH
+        )
+    )
+
+
+def write_binary_queue_log(
+    outfile, new_data_queue: Queue, max_lines: int = 1000
+) -> int:
+    """If there is data in the queue, write it to the file as one packed batch"""
+    records = []
+    while not new_data_queue.empty() and len(records) < max_lines:
+        records.append(BINARY_LOG_RECORD.pack(*new_data_queue.get()))
+    if records:
+        outfile.write(b"".join(records))
+    return len(records)
+
+
+def write_binary_gap_log(outfile, gaps: Sequence[Tuple[float, float, int]]):
+    """Write a gap record for each run of dropped rows"""
+    padding = [0.0] * (TELEMETRY_TUPLE_LENGTH - 4)
+    outfile.write(
+        b"".join(
+            [
+                BINARY_LOG_RECORD.pack(math.nan, start, end, count, *padding)
+                for start, end, count in gaps
+            ]
+        )
+    )
+
+
+def read_binary_log_records(infile) -> Iterator[Tuple[float, ...]]:
+    """Read every record out of a binary log, ignoring a truncated final record"""
+    header = infile.read(BINARY_LOG_HEADER.size)
+    if len(header) < BINARY_LOG_HEADER.size:
+        raise ValueError("Binary log is missing its header")
+    magic, version, field_count = BINARY_LOG_HEADER.unpack(header)
+    if magic != BINARY_LOG_MAGIC:
+        raise ValueError("Not a binary sensor log")
+    if (
+        version not in SUPPORTED_BINARY_LOG_VERSIONS
+        or field_count != TELEMETRY_TUPLE_LENGTH
+    ):
+        raise ValueError(
+            f"Unsupported binary log version {version} with {field_count} fields"
+        )
+    remainder = b""
+    while True:
+        chunk = infile.read(BINARY_LOG_RECORD.size * READ_CHUNK_RECORDS)
+        if not chunk:
+            return
+        data = remainder + chunk
+        usable = len(data) - (len(data) % BINARY_LOG_RECORD.size)
+        yield from BINARY_LOG_RECORD.iter_unpack(data[:usable])
+        remainder = data[usable:]
+
+
+def is_gap_record(record: Sequence[float]) -> bool:
+    """Check if a record marks a run of dropped rows"""
+    return math.isnan(record[0])
+
+
+def read_binary_log(infile) -> Iterator[Tuple[float, ...]]:
+    """Read the telemetry rows out of a binary log"""
+    for record in read_binary_log_records(infile):
+        if not is_gap_record(record):
+            yield record
+
+
+def read_binary_log_gaps(infile) -> Iterator[Tuple[float, float, int]]:
+    """Read the runs of dropped rows recorded in a binary log"""
+    for record in read_binary_log_records(infile):
+        if is_gap_record(record):
+            yield record[1], record[2], int(record[3])
+
+
+def convert_binary_log_to_csv(infile, outfile, gap_outfile=None) -> int:
+    """Convert a binary log into the CSV formats written by write_queue_log and write_gap_log"""
+    lines = 0
+    for record in read_binary_log_records(infile):
+        if is_gap_record(record):
+            if gap_outfile:
+                gap_outfile.write(format_gap(record[1:4]))
+            continue
+        outfile.write(",".join([str(v) for v in record]) + "\n")
+        lines += 1
+    return lines
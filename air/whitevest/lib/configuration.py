@@ -51,6 +51,12 @@ class Configuration:
     default_air_configuration = dict(
         runtime_limit=600,
         output_directory="./data",
+        log_format="csv",
+        data_queue_size=1000,
+        data_queue_overflow=20000,
+        frame_encoding="legacy",
+        frame_samples=None,
+        metrics_interval=10,
         devices=dict(
             rfm9x=dict(
                 sck="SCK",
@@ -4,4 +4,7 @@ import os
 TELEMETRY_TUPLE_LENGTH = 13
 TELEMETRY_STRUCT_STRING = "".join(["d" for _ in range(TELEMETRY_TUPLE_LENGTH)])
 
-TESTING_MODE = os.getenv("REPLAY_DATA") or os.getenv("TESTING")
+REPLAY_DATA = os.getenv("REPLAY_DATA")
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "0"))
+
+TESTING_MODE = REPLAY_DATA or os.getenv("TESTING")
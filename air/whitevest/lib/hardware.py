@@ -2,17 +2,19 @@
 import io
 import logging
 
-import adafruit_bmp3xx
-import adafruit_lsm303_accel
-import adafruit_lsm303dlh_mag
-import adafruit_rfm9x
-import busio
-import serial
-from digitalio import DigitalInOut
-from RPi import GPIO
-
 from whitevest.lib.atomic_value import AtomicValue
 from whitevest.lib.configuration import Configuration
+from whitevest.lib.const import TESTING_MODE
+
+if not TESTING_MODE:
+    import adafruit_bmp3xx
+    import adafruit_lsm303_accel
+    import adafruit_lsm303dlh_mag
+    import adafruit_rfm9x
+    import busio
+    import serial
+    from digitalio import DigitalInOut
+    from RPi import GPIO
 
 
 # pylint: disable=too-few-public-methods
@@ -0,0 +1,145 @@
+"""Lightweight counters, gauges and latency histograms for the hot paths
+
+Recording is a handful of attribute updates with no locking. Each metric is
+expected to have a single writer thread, so the worst case for a snapshot taken
+from another thread is a count that is one update behind.
+"""
+import json
+import time
+from bisect import bisect_left
+from typing import Dict, Sequence
+
+# Upper bounds of the latency histogram buckets in nanoseconds, with one more
+# bucket for everything slower than the last bound
+LATENCY_BUCKETS_NS = (
+    10_000,
+    50_000,
+    100_000,
+    500_000,
+    1_000_000,
+    5_000_000,
+    10_000_000,
+    50_000_000,
+    100_000_000,
+    500_000_000,
+)
+
+
+# pylint: disable=too-few-public-methods
+class Counter:
+    """A monotonically increasing count"""
+
+    def __init__(self):
+        """Start counting from zero"""
+        self.value = 0
+
+    def increment(self, amount: int = 1):
+        """Add to the count"""
+        self.value += amount
+
+
+# pylint: disable=too-few-public-methods
+class Gauge:
+    """The latest value of something plus the largest value seen"""
+
+    def __init__(self):
+        """Start at zero"""
+        self.value = 0
+        self.max = 0
+
+    def set(self, value):
+        """Record the latest value"""
+        self.value = value
+        if value > self.max:  # pylint: disable=consider-using-max-builtin
+            self.max = value
+
+
+class Histogram:
+    """A fixed-bucket histogram of latencies in nanoseconds"""
+
+    def __init__(self, bounds: Sequence[int] = LATENCY_BUCKETS_NS):
+        """Allocate a count for each bucket"""
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        """Add one observation"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:  # pylint: disable=consider-using-max-builtin
+            self.max = value
+
+    def record_since(self, start_ns: int):
+        """Add the time elapsed since a time.perf_counter_ns() reading"""
+        self.record(time.perf_counter_ns() - start_ns)
+
+    def snapshot(self) -> dict:
+        """Summarize the histogram"""
+        labels = [f"le_{bound}" for bound in self.bounds] + ["inf"]
+        return dict(
+            count=self.count,
+            mean=float(self.total) / self.count if self.count else 0.0,
+            max=self.max,
+            buckets=dict(zip(labels, self.counts)),
+        )
+
+
+class MetricsRegistry:
+    """Named metrics shared by the air runtime threads"""
+
+    def __init__(self):
+        """Start with no metrics"""
+        self.counters: Dict[str, Counter] = {}
+        self.gauges: Dict[str, Gauge] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def counter(self, name: str) -> Counter:
+        """Get or create a counter"""
+        if name not in self.counters:
+            self.counters[name] = Counter()
+        return self.counters[name]
+
+    def gauge(self, name: str) -> Gauge:
+        """Get or create a gauge"""
+        if name not in self.gauges:
+            self.gauges[name] = Gauge()
+        return self.gauges[name]
+
+    def histogram(
+        self, name: str, bounds: Sequence[int] = LATENCY_BUCKETS_NS
+    ) -> Histogram:
+        """Get or create a histogram"""
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(bounds)
+        return self.histograms[name]
+
+    def snapshot(self) -> dict:
+        """Summarize every metric"""
+        return dict(
+            counters={name: c.value for name, c in self.counters.items()},
+            gauges={
+                name: dict(value=g.value, max=g.max) for name, g in self.gauges.items()
+            },
+            histograms={name: h.snapshot() for name, h in self.histograms.items()},
+        )
+
+    def dump(self, outfile, timestamp: float):
+        """Append a snapshot to a file as one line of JSON"""
+        outfile.write(json.dumps(dict(timestamp=timestamp, **self.snapshot())) + "\n")
+        outfile.flush()
+
+
+METRICS = MetricsRegistry()
+
+SENSOR_READ_BMP3XX = METRICS.histogram("sensor_read_bmp3xx_ns")
+SENSOR_READ_ACCELEROMETER = METRICS.histogram("sensor_read_lsm303_accel_ns")
+SENSOR_READ_MAGNETOMETER = METRICS.histogram("sensor_read_lsm303_mag_ns")
+SENSOR_READ_GPS = METRICS.histogram("sensor_read_gps_ns")
+LOG_WRITE = METRICS.histogram("log_write_ns")
+RADIO_SEND = METRICS.histogram("radio_send_ns")
+DATA_QUEUE_DEPTH = METRICS.gauge("data_queue_depth")
+DROPPED_SAMPLES = METRICS.counter("dropped_samples")
@@ -0,0 +1,60 @@
+"""Tools for replaying a recorded sensor log through the air runtime"""
+import csv
+import logging
+import time
+from typing import Iterator, Tuple
+
+from whitevest.lib.binary_log import read_binary_log
+from whitevest.lib.telemetry_frame import decode_frame
+
+
+def read_sensor_log(path: str) -> Iterator[Tuple[float, ...]]:
+    """Read the rows of a CSV or binary sensor log"""
+    if path.endswith(".bin"):
+        with open(path, "rb") as infile:
+            yield from read_binary_log(infile)
+        return
+    with open(path, "r", encoding="utf8") as infile:
+        for row in csv.reader(infile):
+            if row:
+                yield tuple(float(value) for value in row)
+
+
+class ReplayRadio:
+    """Stand in for the radio that measures frame throughput and latency"""
+
+    def __init__(self, start_time: float):
+        """Start counting frames sent after start_time"""
+        self.start_time = start_time
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.sent = None
+
+    def send(self, data: bytes):
+        """Record the frame and how long ago its newest sample was taken"""
+        now = time.time()
+        _, rows = decode_frame(data)
+        latency = (now - self.start_time) - max(row[0] for row in rows)
+        self.frames_sent += 1
+        self.bytes_sent += len(data)
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.sent = data
+
+    def log_summary(self):
+        """Log the throughput and latency seen by the radio"""
+        elapsed = time.time() - self.start_time
+        logging.info(
+            "Replay radio sent %d frames (%d bytes) at %f frames/sec",
+            self.frames_sent,
+            self.bytes_sent,
+            float(self.frames_sent) / elapsed,
+        )
+        if self.frames_sent > 0:
+            logging.info(
+                "Replay radio sample latency: mean %f sec, max %f sec",
+                self.total_latency / self.frames_sent,
+                self.max_latency,
+            )
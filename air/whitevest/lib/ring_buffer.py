@@ -0,0 +1,81 @@
+"""A preallocated, single-writer ring buffer of telemetry rows"""
+import struct
+import sys
+from array import array
+from threading import Event
+from typing import List, Optional, Sequence, Tuple
+
+from whitevest.lib.const import TELEMETRY_TUPLE_LENGTH
+
+
+# pylint: disable=too-many-instance-attributes
+class RingBuffer:
+    """A preallocated, single-writer ring buffer of telemetry rows
+
+    Rows are packed into one flat array of doubles. The writer never takes a
+    lock: it packs a row into its slot and then bumps the sequence number.
+    Readers copy a row out and then check the sequence number to make sure the
+    slot was not overwritten while they were copying it. A reader waiting for
+    new rows publishes the sequence number it needs and the writer only
+    signals once that number is reached.
+    """
+
+    def __init__(self, size: int, width: int = TELEMETRY_TUPLE_LENGTH):
+        """Allocate storage for size rows of width values"""
+        self.size = size
+        self.row_struct = struct.Struct(f"{width}d")
+        self.pack_into = self.row_struct.pack_into
+        self.offsets = [i * self.row_struct.size for i in range(size)]
+        self.data = array("d", bytes(self.row_struct.size * size))
+        self.sequence = 0
+        self.read_sequence = 0
+        self.wanted_sequence = sys.maxsize
+        self.new_data = Event()
+
+    def put(self, values: Sequence[float]):
+        """Add a row to the rotating buffer"""
+        sequence = self.sequence
+        self.pack_into(self.data, self.offsets[sequence % self.size], *values)
+        self.sequence = sequence + 1
+        if self.sequence >= self.wanted_sequence:
+            self.new_data.set()
+
+    def get_sequence(self) -> int:
+        """Get the number of rows written so far"""
+        return self.sequence
+
+    def wait_for_new(self, count: int, timeout: float = None) -> bool:
+        """Block until count rows have been written since the last read_new"""
+        self.new_data.clear()
+        self.wanted_sequence = self.read_sequence + count
+        try:
+            if self.sequence < self.wanted_sequence:
+                self.new_data.wait(timeout)
+            return self.sequence >= self.read_sequence + count
+        finally:
+            self.wanted_sequence = sys.maxsize
+
+    def read_row(self, sequence: int) -> Optional[Tuple[float, ...]]:
+        """Copy out the row with the given sequence number if it is still available"""
+        if sequence < 0 or sequence >= self.sequence:
+            return None
+        row = self.row_struct.unpack_from(self.data, self.offsets[sequence % self.size])
+        if self.sequence - sequence >= self.size:
+            return None
+        return row
+
+    def read_new(self, count: int) -> Optional[List[Tuple[float, ...]]]:
+        """Read count evenly spaced rows, oldest first, from the rows not read yet"""
+        newest = self.sequence
+        oldest = max(self.read_sequence, newest - self.size + 1)
+        available = newest - oldest
+        if available < count:
+            return None
+        rows = []
+        for i in range(count):
+            row = self.read_row(oldest - (-i * available // count))
+            if row is None:
+                return None
+            rows.append(row)
+        self.read_sequence = newest
+        return rows
@@ -0,0 +1,81 @@
+"""A queue of telemetry rows that never blocks the sensor thread"""
+from collections import deque
+from typing import List, Sequence, Tuple
+
+from whitevest.lib.metrics import DROPPED_SAMPLES, METRICS
+
+LOG_GAPS = METRICS.counter("log_gaps")
+OVERFLOWED_SAMPLES = METRICS.counter("overflowed_samples")
+
+
+def format_gap(gap: Tuple[float, float, int]) -> str:
+    """Format a run of dropped rows as a line of the CSV gap log"""
+    start, end, count = gap
+    return f"{start},{end},{int(count)}\n"
+
+
+class SampleQueue:
+    """A queue of telemetry rows that never blocks the sensor thread
+
+    Rows past the nominal size spill into an overflow allowance. Once that is
+    used up too, rows are dropped, and each run of dropped rows is remembered
+    as a gap (first timestamp, last timestamp, count) for the log writer to
+    record. There is one producer and one consumer, and deque appends and pops
+    are atomic, so no lock is needed.
+    """
+
+    def __init__(self, size: int = 1000, overflow_size: int = 0):
+        """Create a queue holding size rows plus overflow_size more under pressure"""
+        self.size = size
+        self.capacity = size + overflow_size
+        self.rows = deque()
+        self.gaps = deque()
+        self.gap = None
+
+    def put(self, row: Sequence[float]) -> bool:
+        """Queue a row, or record it as dropped if there is no room left"""
+        if len(self.rows) >= self.capacity:
+            DROPPED_SAMPLES.increment()
+            if self.gap:
+                self.gap[1] = row[0]
+                self.gap[2] += 1
+            else:
+                self.gap = [row[0], row[0], 1]
+            return False
+        if self.gap:
+            self.close_gap()
+        if len(self.rows) >= self.size:
+            OVERFLOWED_SAMPLES.increment()
+        self.rows.append(row)
+        return True
+
+    def get(self) -> Sequence[float]:
+        """Remove and return the oldest row"""
+        return self.rows.popleft()
+
+    def empty(self) -> bool:
+        """Check if there are no rows queued"""
+        return not self.rows
+
+    def full(self) -> bool:
+        """Check if the next row would be dropped"""
+        return len(self.rows) >= self.capacity
+
+    def qsize(self) -> int:
+        """Get the number of rows queued"""
+        return len(self.rows)
+
+    def close_gap(self):
+        """Finish the current run of dropped rows"""
+        gap = self.gap
+        self.gap = None
+        if gap:
+            self.gaps.append(tuple(gap))
+            LOG_GAPS.increment()
+
+    def drain_gaps(self) -> List[Tuple[float, float, int]]:
+        """Remove and return the finished gaps"""
+        gaps = []
+        while self.gaps:
+            gaps.append(self.gaps.popleft())
+        return gaps
@@ -0,0 +1,235 @@
+"""Encoding and decoding of the telemetry frames sent over the radio"""
+import math
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+from whitevest.lib.const import TELEMETRY_STRUCT_STRING, TELEMETRY_TUPLE_LENGTH
+
+RADIO_PAYLOAD_LIMIT = 252
+
+ENCODING_LEGACY = "legacy"
+ENCODING_FLOAT64 = "float64"
+ENCODING_FLOAT32 = "float32"
+ENCODING_FIXED = "fixed"
+ENCODING_DELTA = "delta"
+
+FRAME_ENCODING_IDS = {
+    ENCODING_FLOAT64: 1,
+    ENCODING_FLOAT32: 2,
+    ENCODING_FIXED: 3,
+    ENCODING_DELTA: 4,
+}
+FRAME_ENCODING_NAMES = {value: key for key, value in FRAME_ENCODING_IDS.items()}
+
+FRAME_MAGIC = b"WV"
+FRAME_VERSION = 2
+# magic, version, encoding, sample count, status
+FRAME_HEADER_V1 = struct.Struct("<2sBBBf")
+# ... followed by the dropped sample count and data queue depth, both saturating
+FRAME_HEADER = struct.Struct("<2sBBBfHH")
+FRAME_HEADERS = {1: FRAME_HEADER_V1, 2: FRAME_HEADER}
+
+LEGACY_FRAME_SAMPLES = 2
+LEGACY_FRAME = struct.Struct(
+    "d" + "".join([TELEMETRY_STRUCT_STRING for _ in range(LEGACY_FRAME_SAMPLES)])
+)
+
+# Multipliers that turn each telemetry field into an integer for the fixed and
+# delta encodings: milliseconds, decipascals, centidegrees, cm/s/s, decimicrotesla,
+# 1e-7 degrees, then the GPS quality and satellite counts as-is
+FIELD_SCALES = (
+    1000.0,
+    10.0,
+    100.0,
+    100.0,
+    100.0,
+    100.0,
+    10.0,
+    10.0,
+    10.0,
+    1e7,
+    1e7,
+    1.0,
+    1.0,
+)
+FIXED_FORMAT = "Iihhhhhhhiibb"
+DELTA_FORMAT = "Hhbhhhhhhhhbb"
+
+SAMPLE_STRUCTS = {
+    ENCODING_FLOAT64: struct.Struct("<" + TELEMETRY_STRUCT_STRING),
+    ENCODING_FLOAT32: struct.Struct("<" + "f" * TELEMETRY_TUPLE_LENGTH),
+    ENCODING_FIXED: struct.Struct("<" + FIXED_FORMAT),
+}
+DELTA_SAMPLE = struct.Struct("<" + DELTA_FORMAT)
+
+INTEGER_LIMITS = {
+    "b": (-(2**7), 2**7 - 1),
+    "B": (0, 2**8 - 1),
+    "h": (-(2**15), 2**15 - 1),
+    "H": (0, 2**16 - 1),
+    "i": (-(2**31), 2**31 - 1),
+    "I": (0, 2**32 - 1),
+}
+FIXED_LIMITS = tuple(INTEGER_LIMITS[code] for code in FIXED_FORMAT)
+DELTA_LIMITS = tuple(INTEGER_LIMITS[code] for code in DELTA_FORMAT)
+
+
+def max_frame_samples(encoding: str) -> int:
+    """Get the most samples a frame in the given encoding can carry"""
+    if encoding == ENCODING_LEGACY:
+        return LEGACY_FRAME_SAMPLES
+    space = RADIO_PAYLOAD_LIMIT - FRAME_HEADER.size
+    if encoding == ENCODING_DELTA:
+        return 1 + (space - SAMPLE_STRUCTS[ENCODING_FIXED].size) // DELTA_SAMPLE.size
+    return space // SAMPLE_STRUCTS[encoding].size
+
+
+def scale_row(row: Sequence[float]) -> List[int]:
+    """Convert a telemetry row to fixed point, clamping each field to its range"""
+    scaled = []
+    for value, scale, (low, high) in zip(row, FIELD_SCALES, FIXED_LIMITS):
+        if math.isfinite(value):
+            scaled.append(min(max(int(round(value * scale)), low), high))
+        else:
+            scaled.append(0)
+    return scaled
+
+
+def unscale_row(scaled: Sequence[int]) -> Tuple[float, ...]:
+    """Convert a fixed point row back to floating point"""
+    return tuple(value / scale for value, scale in zip(scaled, FIELD_SCALES))
+
+
+class FrameEncoder:
+    """Packs a configurable number of telemetry rows into each radio frame"""
+
+    def __init__(self, encoding: str = ENCODING_LEGACY, samples: int = None):
+        """Set up an encoder, using as many samples as fit unless told otherwise"""
+        if encoding != ENCODING_LEGACY and encoding not in FRAME_ENCODING_IDS:
+            raise ValueError(f"Unknown frame encoding {encoding}")
+        self.encoding = encoding
+        max_samples = max_frame_samples(encoding)
+        if encoding == ENCODING_LEGACY or not samples:
+            self.samples = max_samples
+        else:
+            self.samples = max(1, min(samples, max_samples))
+
+    def encode(
+        self,
+        status: float,
+        rows: Sequence[Sequence[float]],
+        health: Tuple[int, int] = (0, 0),
+    ) -> bytes:
+        """Encode a status value, runtime health counters and a list of rows into a frame"""
+        if self.encoding == ENCODING_LEGACY:
+            return LEGACY_FRAME.pack(
+                status, *[float(value) for row in rows for value in row]
+            )
+        if self.encoding == ENCODING_DELTA:
+            encoded = encode_delta_samples(rows)
+            if encoded:
+                header = self.encode_header(ENCODING_DELTA, status, len(rows), health)
+                return header + encoded
+            encoding = ENCODING_FIXED
+        else:
+            encoding = self.encoding
+        sample_struct = SAMPLE_STRUCTS[encoding]
+        if encoding == ENCODING_FIXED:
+            samples = [sample_struct.pack(*scale_row(row)) for row in rows]
+        else:
+            samples = [sample_struct.pack(*row) for row in rows]
+        header = self.encode_header(encoding, status, len(rows), health)
+        return header + b"".join(samples)
+
+    @staticmethod
+    def encode_header(
+        encoding: str, status: float, samples: int, health: Tuple[int, int]
+    ) -> bytes:
+        """Encode the versioned frame header"""
+        return FRAME_HEADER.pack(
+            FRAME_MAGIC,
+            FRAME_VERSION,
+            FRAME_ENCODING_IDS[encoding],
+            samples,
+            status,
+            *[min(value, 0xFFFF) for value in health],
+        )
+
+
+def encode_delta_samples(rows: Sequence[Sequence[float]]) -> bytes:
+    """Encode a fixed point keyframe followed by deltas, or nothing if a delta overflows"""
+    keyframe = scale_row(rows[0])
+    encoded = [SAMPLE_STRUCTS[ENCODING_FIXED].pack(*keyframe)]
+    for row in rows[1:]:
+        deltas = [value - key for value, key in zip(scale_row(row), keyframe)]
+        for delta, (low, high) in zip(deltas, DELTA_LIMITS):
+            if delta < low or delta > high:
+                return b""
+        encoded.append(DELTA_SAMPLE.pack(*deltas))
+    return b"".join(encoded)
+
+
+def decode_frame_header(data: bytes) -> Optional[dict]:
+    """Decode the header of a versioned frame, or None for a legacy frame"""
+    if len(data) < FRAME_HEADER_V1.size:
+        return None
+    magic, version, encoding_id = FRAME_HEADER_V1.unpack_from(data)[:3]
+    if magic != FRAME_MAGIC or encoding_id not in FRAME_ENCODING_NAMES:
+        return None
+    if version not in FRAME_HEADERS:
+        raise ValueError(f"Unsupported frame version {version}")
+    header_struct = FRAME_HEADERS[version]
+    fields = header_struct.unpack_from(data)
+    header = dict(
+        version=version,
+        encoding=FRAME_ENCODING_NAMES[encoding_id],
+        samples=fields[3],
+        status=fields[4],
+        dropped_samples=0,
+        queue_depth=0,
+        size=header_struct.size,
+    )
+    if version >= 2:
+        header["dropped_samples"], header["queue_depth"] = fields[5:7]
+    return header
+
+
+def decode_frame(data: bytes) -> Tuple[float, List[Tuple[float, ...]]]:
+    """Decode a frame into its status value and rows, detecting the encoding"""
+    header = decode_frame_header(data)
+    if header:
+        rows = decode_samples(
+            header["encoding"], header["samples"], data[header["size"] :]
+        )
+        return header["status"], rows
+    if len(data) == LEGACY_FRAME.size:
+        values = LEGACY_FRAME.unpack(data)
+        rows = []
+        for i in range(LEGACY_FRAME_SAMPLES):
+            start = 1 + (i * TELEMETRY_TUPLE_LENGTH)
+            rows.append(values[start : start + TELEMETRY_TUPLE_LENGTH])
+        return values[0], rows
+    raise ValueError("Unrecognized telemetry frame")
+
+
+def decode_samples(encoding: str, samples: int, data: bytes) -> List[Tuple[float, ...]]:
+    """Decode the samples that follow a frame header"""
+    if encoding == ENCODING_DELTA:
+        fixed = SAMPLE_STRUCTS[ENCODING_FIXED]
+        keyframe = fixed.unpack_from(data)
+        rows = [unscale_row(keyframe)]
+        for i in range(samples - 1):
+            deltas = DELTA_SAMPLE.unpack_from(
+                data, fixed.size + (i * DELTA_SAMPLE.size)
+            )
+            rows.append(
+                unscale_row([key + delta for key, delta in zip(keyframe, deltas)])
+            )
+        return rows
+    sample_struct = SAMPLE_STRUCTS[encoding]
+    rows = [
+        sample_struct.unpack_from(data, i * sample_struct.size) for i in range(samples)
+    ]
+    if encoding == ENCODING_FIXED:
+        return [unscale_row(row) for row in rows]
+    return rows
@@ -1,22 +1,34 @@
 """Functions shared between air and ground runtimes"""
 import logging
-import math
-import struct
 import time
 from queue import Queue
 from threading import Thread
-from typing import Tuple
+from typing import Callable, Sequence, Tuple
 
 import pynmea2
 
-from whitevest.lib.atomic_buffer import AtomicBuffer
 from whitevest.lib.atomic_value import AtomicValue
 from whitevest.lib.configuration import Configuration
-from whitevest.lib.const import TELEMETRY_STRUCT_STRING, TESTING_MODE
+from whitevest.lib.const import TESTING_MODE
+from whitevest.lib.metrics import (
+    DATA_QUEUE_DEPTH,
+    DROPPED_SAMPLES,
+    LOG_WRITE,
+    RADIO_SEND,
+)
+from whitevest.lib.ring_buffer import RingBuffer
+from whitevest.lib.sample_queue import SampleQueue, format_gap
+from whitevest.lib.telemetry_frame import FrameEncoder
 
 if not TESTING_MODE:
     from whitevest.lib.hardware import init_gps
 
+# Bounds on how long the log writer sleeps between drains
+LOG_WRITE_MIN_INTERVAL = 0.25
+LOG_WRITE_MAX_INTERVAL = 7.0
+# Fraction of the data queue's nominal size the writer lets build up between drains
+LOG_TARGET_FILL = 0.5
+
 
 def handle_exception(message: str, exception: Exception):
     """Log an exception"""
@@ -36,6 +48,11 @@ def write_queue_log(outfile, new_data_queue: Queue, max_lines: int = 1000) -> in
     return i
 
 
+def write_gap_log(outfile, gaps: Sequence[Tuple[float, float, int]]):
+    """Write the runs of dropped rows to a CSV gap log"""
+    outfile.write("".join([format_gap(gap) for gap in gaps]))
+
+
 def take_gps_reading(sio, gps_value: AtomicValue) -> bool:
     """Grab the most recent data from GPS feed"""
     line = sio.readline()
@@ -83,8 +100,8 @@ def create_gps_thread(
 # pylint: disable=too-many-arguments
 def digest_next_sensor_reading(
     start_time: float,
-    data_queue: Queue,
-    current_readings: AtomicBuffer,
+    data_queue: SampleQueue,
+    current_readings: RingBuffer,
     gps_value,
     altimeter_value,
     magnetometer_accelerometer_value,
@@ -97,66 +114,100 @@ def digest_next_sensor_reading(
         *magnetometer_accelerometer_value,
         *gps_value,
     )
-    if not data_queue.full():
-        data_queue.put(info)
+    data_queue.put(info)
     current_readings.put(info)
     return now
 
 
+# pylint: disable=too-many-arguments,too-many-locals
 def write_sensor_log(
     start_time: float,
     outfile,
-    data_queue: Queue,
+    data_queue: SampleQueue,
     continue_running: AtomicValue,
     continue_logging: AtomicValue,
+    write_function: Callable[[object, Queue, int], int] = write_queue_log,
+    gap_function: Callable[[Sequence[Tuple[float, float, int]]], None] = None,
 ):
-    """Write the queue to the log until told to stop"""
+    """Write the queue to the log until told to stop, draining as fast as it fills"""
     lines_written = 0
     last_queue_check = time.time()
+    last_drain = time.time()
+    remaining = 0
+    interval = LOG_WRITE_MAX_INTERVAL
     while continue_running.get_value() and continue_logging.get_value():
         try:
-            new_lines_written = write_queue_log(outfile, data_queue, 300)
+            depth = data_queue.qsize()
+            DATA_QUEUE_DEPTH.set(depth)
+            now = time.time()
+            ingest_rate = float(depth - remaining) / max(now - last_drain, 0.001)
+            last_drain = now
+            if ingest_rate > 0:
+                interval = min(
+                    max(
+                        (data_queue.size * LOG_TARGET_FILL) / ingest_rate,
+                        LOG_WRITE_MIN_INTERVAL,
+                    ),
+                    LOG_WRITE_MAX_INTERVAL,
+                )
+            write_start = time.perf_counter_ns()
+            new_lines_written = write_function(outfile, data_queue, max(depth, 1))
+            if new_lines_written > 0:
+                LOG_WRITE.record_since(write_start)
+            remaining = data_queue.qsize()
+            gaps = data_queue.drain_gaps()
+            if gaps and gap_function:
+                gap_function(gaps)
             if new_lines_written > 0:
                 lines_written += new_lines_written
                 if last_queue_check + 10.0 < time.time():
                     last_queue_check = time.time()
                     elapsed = last_queue_check - start_time
                     logging.info(
-                        "Lines written: %d in %s seconds with %d ready",
+                        "Lines written: %d in %s seconds with %d ready, draining every %f seconds",
                         lines_written,
                         elapsed,
-                        data_queue.qsize(),
+                        remaining,
+                        interval,
                     )
-            time.sleep(7)
+            time.sleep(interval)
         except Exception as ex:  # pylint: disable=broad-except
             handle_exception("Telemetry log line writing failure", ex)
+    try:
+        write_function(outfile, data_queue, data_queue.qsize())
+        data_queue.close_gap()
+        gaps = data_queue.drain_gaps()
+        if gaps and gap_function:
+            gap_function(gaps)
+    except Exception as ex:  # pylint: disable=broad-except
+        handle_exception("Telemetry log line writing failure", ex)
 
 
+# pylint: disable=too-many-arguments
 def transmit_latest_readings(
     pcnt_to_limit: AtomicValue,
     rfm9x,
     last_check: float,
     readings_sent: int,
     start_time: float,
-    current_readings: AtomicBuffer,
+    current_readings: RingBuffer,
+    frame_encoder: FrameEncoder = None,
 ) -> Tuple[int, float]:
-    """Get the latest value from the sensor store and transmit it as a byte array"""
-    infos = current_readings.read()
-    if len(infos) < 2:
-        return readings_sent, last_check
-    info1 = infos[0]
-    info2 = infos[int(math.ceil(len(infos) / 2))]
-    if not info1 or not info2:
+    """Get the latest values from the sensor store and transmit them as a frame"""
+    if not frame_encoder:
+        frame_encoder = FrameEncoder()
+    infos = current_readings.read_new(frame_encoder.samples)
+    if not infos:
         return readings_sent, last_check
-    info = (*info1, *info2)
-    clean_info = [float(i) for i in info]
-    encoded = struct.pack(
-        "d" + TELEMETRY_STRUCT_STRING + TELEMETRY_STRUCT_STRING,
-        *(pcnt_to_limit.get_value(), *clean_info)
+    encoded = frame_encoder.encode(
+        pcnt_to_limit.get_value(),
+        infos,
+        (DROPPED_SAMPLES.value, DATA_QUEUE_DEPTH.value),
     )
-    current_readings.clear()
     logging.debug("Transmitting %d bytes", len(encoded))
+    send_start = time.perf_counter_ns()
     rfm9x.send(encoded)
+    RADIO_SEND.record_since(send_start)
     readings_sent += 1
     if last_check > 0 and last_check + 10.0 < time.time():
         last_check = time.time()
@@ -1,11 +1,15 @@
 """Inboard data capture and transmission threads"""
+
 import logging
 import os.path
 import time
-from queue import Queue
 
-from whitevest.lib.atomic_buffer import AtomicBuffer
 from whitevest.lib.atomic_value import AtomicValue
+from whitevest.lib.binary_log import (
+    write_binary_gap_log,
+    write_binary_log_header,
+    write_binary_queue_log,
+)
 from whitevest.lib.configuration import Configuration
 from whitevest.lib.const import TESTING_MODE
 from whitevest.lib.hardware import (
@@ -13,10 +17,23 @@ from whitevest.lib.hardware import (
     init_magnetometer_accelerometer,
     init_radio,
 )
+from whitevest.lib.metrics import (
+    METRICS,
+    SENSOR_READ_ACCELEROMETER,
+    SENSOR_READ_BMP3XX,
+    SENSOR_READ_GPS,
+    SENSOR_READ_MAGNETOMETER,
+)
+from whitevest.lib.replay import read_sensor_log
+from whitevest.lib.ring_buffer import RingBuffer
+from whitevest.lib.sample_queue import SampleQueue
+from whitevest.lib.telemetry_frame import ENCODING_LEGACY, FrameEncoder
 from whitevest.lib.utils import (
     digest_next_sensor_reading,
     handle_exception,
     transmit_latest_readings,
+    write_gap_log,
+    write_queue_log,
     write_sensor_log,
 )
 
@@ -24,12 +41,12 @@ if not TESTING_MODE:
     import picamera  # pylint: disable=import-error
 
 
-# pylint: disable=too-many-arguments
+# pylint: disable=too-many-arguments,too-many-locals
 def sensor_reading_loop(
     configuration: Configuration,
     start_time: float,
-    data_queue: Queue,
-    current_readings: AtomicBuffer,
+    data_queue: SampleQueue,
+    current_readings: RingBuffer,
     gps_value: AtomicValue,
     continue_running: AtomicValue,
 ):
@@ -42,13 +59,25 @@ def sensor_reading_loop(
         readings = 0.0
         while continue_running.get_value():
             try:
+                read_start = time.perf_counter_ns()
+                current_gps_value = gps_value.get_value()
+                SENSOR_READ_GPS.record_since(read_start)
+                read_start = time.perf_counter_ns()
+                altimeter_value = bmp._read()  # pylint: disable=protected-access
+                SENSOR_READ_BMP3XX.record_since(read_start)
+                read_start = time.perf_counter_ns()
+                acceleration = accel.acceleration
+                SENSOR_READ_ACCELEROMETER.record_since(read_start)
+                read_start = time.perf_counter_ns()
+                magnetic = mag.magnetic
+                SENSOR_READ_MAGNETOMETER.record_since(read_start)
                 digest_next_sensor_reading(
                     start_time,
                     data_queue,
                     current_readings,
-                    gps_value.get_value(),
-                    bmp._read(),  # pylint: disable=protected-access
-                    (*accel.acceleration, *mag.magnetic),
+                    current_gps_value,
+                    altimeter_value,
+                    (*acceleration, *magnetic),
                 )
                 readings += 1.0
                 now = time.time()
@@ -63,10 +92,59 @@ def sensor_reading_loop(
         handle_exception("Telemetry measurement point reading failure", ex)
 
 
+# pylint: disable=too-many-arguments
+def replay_sensor_reading_loop(
+    replay_path: str,
+    replay_speed: float,
+    start_time: float,
+    data_queue: SampleQueue,
+    current_readings: RingBuffer,
+    continue_running: AtomicValue,
+):
+    """Feed a recorded sensor log through the pipeline, then stop the runtime"""
+    try:
+        logging.info("Starting sensor replay from %s", replay_path)
+        replay_start = time.time()
+        first_timestamp = None
+        readings = 0
+        for row in read_sensor_log(replay_path):
+            if not continue_running.get_value():
+                break
+            if replay_speed > 0:
+                if first_timestamp is None:
+                    first_timestamp = row[0]
+                delay = (
+                    replay_start
+                    + ((row[0] - first_timestamp) / replay_speed)
+                    - time.time()
+                )
+                if delay > 0:
+                    time.sleep(delay)
+            digest_next_sensor_reading(
+                start_time,
+                data_queue,
+                current_readings,
+                row[9:13],
+                row[1:3],
+                row[3:9],
+            )
+            readings += 1
+        total_time = time.time() - replay_start
+        logging.info(
+            "Replayed %d readings in %f seconds at an average rate of %f/sec",
+            readings,
+            total_time,
+            float(readings) / total_time,
+        )
+    except Exception as ex:  # pylint: disable=broad-except
+        handle_exception("Sensor replay failure", ex)
+    continue_running.update(False)
+
+
 def sensor_log_writing_loop(
     configuration: Configuration,
     start_time: float,
-    data_queue: Queue,
+    data_queue: SampleQueue,
     continue_running: AtomicValue,
     continue_logging: AtomicValue,
 ):
@@ -74,17 +152,72 @@ def sensor_log_writing_loop(
     try:
         logging.info("Starting sensor log writing loop")
         output_directory = configuration.get("output_directory")
+        if configuration.get("log_format", "csv") == "binary":
+            with open(
+                os.path.join(output_directory, f"sensor_log_{int(start_time)}.bin"),
+                "wb",
+            ) as outfile:
+                write_binary_log_header(outfile)
+                write_sensor_log(
+                    start_time,
+                    outfile,
+                    data_queue,
+                    continue_running,
+                    continue_logging,
+                    write_binary_queue_log,
+                    lambda gaps: write_binary_gap_log(outfile, gaps),
+                )
+        else:
+            with open(
+                os.path.join(output_directory, f"sensor_log_{int(start_time)}.csv"),
+                "w",
+                encoding="utf8",
+            ) as outfile, open(
+                os.path.join(
+                    output_directory, f"sensor_log_{int(start_time)}_gaps.csv"
+                ),
+                "w",
+                encoding="utf8",
+            ) as gap_outfile:
+                write_sensor_log(
+                    start_time,
+                    outfile,
+                    data_queue,
+                    continue_running,
+                    continue_logging,
+                    write_queue_log,
+                    lambda gaps: write_gap_log(gap_outfile, gaps),
+                )
+        logging.info("Telemetry log writing loop complete")
+    except Exception as ex:  # pylint: disable=broad-except
+        handle_exception("Telemetry log line writing failure", ex)
+
+
+def metrics_logging_loop(
+    configuration: Configuration,
+    start_time: float,
+    continue_running: AtomicValue,
+):
+    """Periodically append a snapshot of the runtime metrics to a file"""
+    try:
+        logging.info("Starting metrics logging loop")
+        output_directory = configuration.get("output_directory")
+        interval = configuration.get("metrics_interval", 10)
         with open(
-            os.path.join(output_directory, f"sensor_log_{int(start_time)}.csv"),
-            "w",
+            os.path.join(output_directory, f"metrics_{int(start_time)}.jsonl"),
+            "a",
             encoding="utf8",
         ) as outfile:
-            write_sensor_log(
-                start_time, outfile, data_queue, continue_running, continue_logging
-            )
-        logging.info("Telemetry log writing loop complete")
+            last_dump = time.time()
+            while continue_running.get_value():
+                if time.time() - last_dump >= interval:
+                    last_dump = time.time()
+                    METRICS.dump(outfile, last_dump - start_time)
+                time.sleep(1)
+            METRICS.dump(outfile, time.time() - start_time)
+        logging.info("Metrics logging loop complete")
     except Exception as ex:  # pylint: disable=broad-except
-        handle_exception("Telemetry log line writing failure", ex)
+        handle_exception("Metrics logging failure", ex)
 
 
 def camera_thread(
@@ -109,31 +242,39 @@ def camera_thread(
         handle_exception("Video capture failure", ex)
 
 
+# pylint: disable=too-many-arguments
 def transmitter_thread(
     configuration: Configuration,
     start_time: float,
-    current_readings: AtomicBuffer,
+    current_readings: RingBuffer,
     pcnt_to_limit: AtomicValue,
     continue_running: AtomicValue,
+    rfm9x=None,
 ):
     """Transmit the latest data"""
     try:
-        rfm9x = init_radio(configuration)
+        if not rfm9x:
+            rfm9x = init_radio(configuration)
         if not rfm9x:
             return
+        frame_encoder = FrameEncoder(
+            configuration.get("frame_encoding", ENCODING_LEGACY),
+            configuration.get("frame_samples"),
+        )
         last_check = time.time()
         readings_sent = 0
         while continue_running.get_value():
             try:
-                readings_sent, last_check = transmit_latest_readings(
-                    pcnt_to_limit,
-                    rfm9x,
-                    last_check,
-                    readings_sent,
-                    start_time,
-                    current_readings,
-                )
-                time.sleep(0)
+                if current_readings.wait_for_new(frame_encoder.samples, 1.0):
+                    readings_sent, last_check = transmit_latest_readings(
+                        pcnt_to_limit,
+                        rfm9x,
+                        last_check,
+                        readings_sent,
+                        start_time,
+                        current_readings,
+                        frame_encoder,
+                    )
             except Exception as ex:  # pylint: disable=broad-except
                 handle_exception("Transmitter failure", ex)
     except Exception as ex:  # pylint: disable=broad-except